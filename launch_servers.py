@@ -4,29 +4,37 @@
 Launch all MCP servers for the cybersecurity application
 """
 
+import logging
+import signal
 import subprocess
 import sys
 import time
 import threading
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Separator printed around the launch summary
+_BANNER = "=" * 50
+
 def launch_server(server_script, port, name):
     """Launch a single MCP server"""
-    print(f"Starting {name} server on port {port}...")
+    logger.info("Starting %s server on port %s...", name, port)
     
     try:
         process = subprocess.Popen([
             sys.executable, server_script
         ], cwd=Path(__file__).parent)
         
-        print(f"✓ {name} server started (PID: {process.pid})")
+        logger.info("✓ %s server started (PID: %s)", name, process.pid)
         return process
     except Exception as e:
-        print(f"✗ Failed to start {name} server: {e}")
+        logger.error("✗ Failed to start %s server: %s", name, e)
         return None
 
 def main():
     """Launch all MCP servers"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     servers = [
         ("src/servers/virustotal_server.py", 8001, "VirusTotal"),
@@ -37,8 +45,8 @@ def main():
     
     processes = []
     
-    print("🚀 Launching MCP Cybersecurity Servers...")
-    print("=" * 50)
+    logger.info("🚀 Launching MCP Cybersecurity Servers...")
+    logger.info(_BANNER)
     
     for server_script, port, name in servers:
         process = launch_server(server_script, port, name)
@@ -46,27 +54,30 @@ def main():
             processes.append((process, name))
         time.sleep(1)  # Brief delay between launches
         
-    print("\n" + "=" * 50)
-    print(f"✓ Started {len(processes)} servers")
-    print("\nServer URLs:")
+    logger.info("\n%s", _BANNER)
+    logger.info("✓ Started %s servers", len(processes))
+    logger.info("\nServer URLs:")
     for _, port, name in servers:
-        print(f"  {name}: http://0.0.0.0:{port}")
+        logger.info("  %s: http://0.0.0.0:%s", name, port)
         
-    print("\nTo stop servers, press Ctrl+C")
+    logger.info("\nTo stop servers, press Ctrl+C")
     
-    try:
-        # Wait for servers to run
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("\n\n🛑 Stopping all servers...")
-        for process, name in processes:
-            try:
-                process.terminate()
-                print(f"✓ Stopped {name} server")
-            except:
-                pass
-        print("All servers stopped.")
+    # Sleep until Ctrl+C or a supervisor's SIGTERM; the timed wait keeps
+    # the main thread interruptible on Windows
+    stop_requested = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_requested.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_requested.set())
+    while not stop_requested.wait(1):
+        pass
+    
+    logger.info("\n\n🛑 Stopping all servers...")
+    for process, name in processes:
+        try:
+            process.terminate()
+            logger.info("✓ Stopped %s server", name)
+        except Exception:
+            pass
+    logger.info("All servers stopped.")
 
 if __name__ == "__main__":
     main()
@@ -6,12 +6,8 @@ Main entry point for the desktop application
 """
 
 import asyncio
-import sys
-from pathlib import Path
-
-# Add the current directory to Python path
-sys.path.append(str(Path(__file__).parent))
 
+# Running this script puts its directory first on sys.path, so the src package resolves
 from src.client.desktop_app import CyberSecurityApp
 
 def main():
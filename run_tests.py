@@ -45,7 +45,7 @@ def run_tests():
                 print(f"✅ Test suite {i} passed")
         except FileNotFoundError:
             print(f"❌ pytest not found. Installing...")
-            subprocess.run([sys.executable, "-m", "pip", "install", "pytest", "pytest-asyncio"])
+            subprocess.run([sys.executable, "-m", "pip", "install", "pytest", "pytest-asyncio", "pytest-xdist"])
             result = subprocess.run(cmd, capture_output=False, text=True)
             if result.returncode != 0:
                 print(f"❌ Test suite {i} failed after installing pytest")
@@ -75,7 +75,7 @@ def install_test_dependencies():
     try:
         subprocess.run([
             sys.executable, "-m", "pip", "install", 
-            "pytest", "pytest-asyncio", "httpx"
+            "pytest", "pytest-asyncio", "httpx", "pytest-xdist"
         ], check=True)
         print("✅ Test dependencies installed")
         return True
@@ -91,6 +91,7 @@ if __name__ == "__main__":
     try:
         import pytest
         import httpx
+        import xdist  # pytest.ini runs with -n auto
     except ImportError:
         if not install_test_dependencies():
             sys.exit(1)
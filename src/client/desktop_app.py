@@ -23,7 +23,10 @@ class CyberSecurityApp:
         
         self.config = AppConfig()
         self.mcp_client = MCPClient(self.config.mcp_servers)
-        self.event_processor = EventProcessor(self.mcp_client)
+        self.event_processor = EventProcessor(
+            self.mcp_client,
+            latency_optimized=self.config.ai_config.get("latency_optimized", False)
+        )
         self.kafka_consumer = KafkaEventConsumer()
         
         self.audit_logs = []
@@ -86,9 +86,11 @@ class EventFormatValidator:
         }
         
         # Check for required fields
+        # Normalize the keys once, then each required field is a set probe
+        normalized_keys = {key.lower().replace("_", "").replace(" ", "") for key in event_data}
         required_fields = ["timestamp"]
         for field in required_fields:
-            if not any(key.lower().replace("_", "").replace(" ", "") == field for key in event_data.keys()):
+            if field not in normalized_keys:
                 validation_result["warnings"].append(f"Missing recommended field: {field}")
         
         # Validate timestamp formats
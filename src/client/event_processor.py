@@ -1,22 +1,90 @@
 
 import asyncio
 import json
+import operator
 import re
-import boto3
-from typing import Dict, List, Any, Optional
+import orjson
+from functools import lru_cache
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 from .event_parser import EventParser, SecurityEventTaxonomy
 
+# Indicator patterns compiled once at import rather than per extracted event
+IP_PATTERN = re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b')
+DOMAIN_PATTERN = re.compile(r'\b[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*\b')
+
+# MD5, SHA-1 and SHA-256 digests in one pass, bucketed by length afterwards
+HASH_PATTERN = re.compile(r'\b(?:[a-fA-F0-9]{32}|[a-fA-F0-9]{40}|[a-fA-F0-9]{64})\b')
+HASH_TYPES_BY_LENGTH = {32: "md5", 40: "sha1", 64: "sha256"}
+
+# Fallback prompt keywords, matched as substrings of the lower-cased prompt
+THREAT_KEYWORDS_PATTERN = re.compile(r'malicious|reputation|scan|virus|threat')
+INCIDENT_KEYWORDS_PATTERN = re.compile(r'ticket|incident|servicenow')
+
+# Event fields copied into extracted attributes, in priority order per attribute
+SECURITY_FIELDS = (
+    ("severity", ("severity", "priority", "risk_level", "threat_level", "criticality")),
+    ("host_info", ("hostname", "host", "computer_name", "endpoint", "machine_name")),
+    ("event_type", ("event_type", "alert_type", "detection_type", "rule_name", "category")),
+    ("network_info", ("src_ip", "dst_ip", "source_ip", "destination_ip", "protocol", "port"))
+)
+
+def _threat_score(result_data: Dict[str, Any]) -> float:
+    """Extract threat score from various possible locations in a server result"""
+    if "threat_score" in result_data:
+        return result_data["threat_score"]
+    elif "data" in result_data and "threat_score" in result_data["data"]:
+        return result_data["data"]["threat_score"]
+    elif "malicious" in result_data and "total" in result_data:
+        # VirusTotal-style response
+        malicious = result_data.get("malicious", 0)
+        total = result_data.get("total", 1)
+        return (malicious / total) * 100 if total > 0 else 0
+    return 0
+
+@lru_cache(maxsize=256)
+def _compile_condition(condition: str) -> Callable[[Dict[str, Any]], bool]:
+    """Parse a workflow condition once into a predicate over the dependency's result data"""
+    condition_lower = condition.lower()
+    
+    # Common condition patterns
+    if "threat_score" in condition:
+        # Evaluate numeric conditions
+        for symbol, compare in ((">", operator.gt), ("<", operator.lt), ("==", operator.eq)):
+            if symbol in condition:
+                threshold = float(condition.split(symbol)[1].strip())
+                return lambda result_data: compare(_threat_score(result_data), threshold)
+    
+    elif "severity" in condition:
+        for level, accepted in (("high", ("high", "critical")), ("critical", ("critical",)), ("medium", ("medium", "high", "critical"))):
+            if level in condition_lower:
+                return lambda result_data: result_data.get("severity", "").lower() in accepted
+    
+    elif "compromised" in condition_lower:
+        def is_compromised(result_data):
+            status = result_data.get("status", "").lower()
+            return "compromised" in status or "infected" in status
+        return is_compromised
+    
+    elif "malicious" in condition_lower:
+        return lambda result_data: result_data.get("malicious", 0) > 0 or "malicious" in str(result_data).lower()
+    
+    return lambda result_data: True  # Default to true if condition can't be evaluated
+
 class EventProcessor:
     """AI-driven event processor using Claude 3.5 Sonnet from AWS Bedrock"""
     
-    def __init__(self, mcp_client):
+    def __init__(self, mcp_client, latency_optimized: bool = False):
         self.mcp_client = mcp_client
+        # Imported here so importing this module doesn't pay boto3's startup cost
+        import boto3
         self.bedrock_client = boto3.client(
             'bedrock-runtime',
             region_name='us-east-1'  # Claude is available in us-east-1
         )
         self.claude_model_id = "anthropic.claude-3-5-sonnet-20241022-v2:0"
+        # Bedrock's latency-optimized inference is only offered for some models/regions, so it is opt-in
+        self.invoke_options = {"performanceConfigLatency": "optimized"} if latency_optimized else {}
         self.event_parser = EventParser()
         
     async def process_event(self, event_data: Dict[str, Any], user_prompt: str, event_format: str = "auto") -> Dict[str, Any]:
@@ -64,11 +132,12 @@ class EventProcessor:
                             "content": claude_prompt
                         }
                     ]
-                })
+                }),
+                **self.invoke_options
             )
             
             # Parse Claude's response
-            response_body = json.loads(response['body'].read())
+            response_body = orjson.loads(response['body'].read())
             claude_analysis = response_body['content'][0]['text']
             
             # Parse Claude's structured response
@@ -185,7 +254,7 @@ Focus on:
             
             if json_start != -1 and json_end != -1:
                 json_str = claude_response[json_start:json_end]
-                claude_analysis = json.loads(json_str)
+                claude_analysis = orjson.loads(json_str)
                 
                 # Sort actions by step number for proper sequential execution
                 determined_actions = claude_analysis.get("determined_actions", [])
@@ -227,7 +296,7 @@ Focus on:
         prompt_lower = user_prompt.lower()
         
         # Basic rule-based logic as fallback
-        if any(keyword in prompt_lower for keyword in ["malicious", "reputation", "scan", "virus", "threat"]):
+        if THREAT_KEYWORDS_PATTERN.search(prompt_lower):
             if "ips" in event_attributes.get("indicators", {}):
                 for ip in event_attributes["indicators"]["ips"][:3]:
                     actions.append({
@@ -238,7 +307,7 @@ Focus on:
                         "rationale": "IP reputation check requested"
                     })
                     
-        if any(keyword in prompt_lower for keyword in ["ticket", "incident", "servicenow"]):
+        if INCIDENT_KEYWORDS_PATTERN.search(prompt_lower):
             actions.append({
                 "server": "servicenow",
                 "action": "create_record",
@@ -273,42 +342,31 @@ Focus on:
         }
         
         # Extract IPs
-        ip_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
         text_content = json.dumps(event_data)
-        ips = re.findall(ip_pattern, text_content)
+        ips = IP_PATTERN.findall(text_content)
         if ips:
             attributes["indicators"]["ips"] = list(set(ips))
             
         # Extract domains
-        domain_pattern = r'\b[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*\b'
-        domains = re.findall(domain_pattern, text_content)
+        domains = DOMAIN_PATTERN.findall(text_content)
         domains = [d for d in domains if '.' in d and not d.replace('.', '').isdigit()]
         if domains:
             attributes["indicators"]["domains"] = list(set(domains))
             
         # Extract file hashes
-        hash_patterns = {
-            "md5": r'\b[a-fA-F0-9]{32}\b',
-            "sha1": r'\b[a-fA-F0-9]{40}\b', 
-            "sha256": r'\b[a-fA-F0-9]{64}\b'
-        }
+        hashes_by_length = {}
+        for file_hash in HASH_PATTERN.findall(text_content):
+            hashes_by_length.setdefault(len(file_hash), set()).add(file_hash)
         
-        for hash_type, pattern in hash_patterns.items():
-            hashes = re.findall(pattern, text_content)
+        for length, hash_type in HASH_TYPES_BY_LENGTH.items():
+            hashes = hashes_by_length.get(length)
             if hashes:
                 if "hashes" not in attributes["indicators"]:
                     attributes["indicators"]["hashes"] = {}
-                attributes["indicators"][hash_type] = list(set(hashes))
+                attributes["indicators"][hash_type] = list(hashes)
         
         # Extract common security event fields
-        security_fields = {
-            "severity": ["severity", "priority", "risk_level", "threat_level", "criticality"],
-            "host_info": ["hostname", "host", "computer_name", "endpoint", "machine_name"],
-            "event_type": ["event_type", "alert_type", "detection_type", "rule_name", "category"],
-            "network_info": ["src_ip", "dst_ip", "source_ip", "destination_ip", "protocol", "port"]
-        }
-        
-        for attr_key, field_names in security_fields.items():
+        for attr_key, field_names in SECURITY_FIELDS:
             for field in field_names:
                 if field in event_data:
                     if attr_key == "host_info":
@@ -322,92 +380,105 @@ Focus on:
         return attributes
         
     async def execute_actions(self, event_data: Dict[str, Any], analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Execute the determined actions via MCP servers in sequential order with dependency handling"""
-        results = []
+        """Execute the determined actions via MCP servers, running independent steps of each dependency layer concurrently"""
+        actions = analysis["determined_actions"]
+        results = [None] * len(actions)
         action_results = {}  # Store results by step number for dependency resolution
         
-        for action in analysis["determined_actions"]:
-            step = action.get("step", len(results) + 1)
-            
-            # Check if this action depends on a previous step
+        # Layer the plan: a step runs one layer after the earlier step it depends on
+        layer_by_step = {}
+        layers = []
+        for index, action in enumerate(actions):
+            step = action.get("step", index + 1)
             depends_on = action.get("depends_on")
-            condition = action.get("condition")
-            
-            should_execute = True
-            dependency_result = None
-            
-            if depends_on is not None:
-                dependency_result = action_results.get(depends_on)
-                if dependency_result is None:
-                    should_execute = False
-                    results.append({
-                        "step": step,
-                        "action": action,
-                        "success": False,
-                        "error": f"Dependency step {depends_on} not found or failed",
-                        "timestamp": datetime.now().isoformat(),
-                        "ai_reasoning": action.get("rationale", ""),
-                        "skipped": True
-                    })
-                    continue
-                
-                # Evaluate condition if specified
-                if condition and not self.evaluate_condition(condition, dependency_result):
-                    should_execute = False
-                    results.append({
-                        "step": step,
-                        "action": action,
-                        "success": True,
-                        "result": {"message": f"Condition '{condition}' not met, step skipped"},
-                        "timestamp": datetime.now().isoformat(),
-                        "ai_reasoning": action.get("rationale", ""),
-                        "skipped": True,
-                        "condition_evaluated": condition
-                    })
-                    continue
+            layer = layer_by_step[depends_on] + 1 if depends_on in layer_by_step else 0
+            layer_by_step.setdefault(step, layer)
+            if layer == len(layers):
+                layers.append([])
+            layers[layer].append((index, step, action))
+        
+        for layer in layers:
+            layer_results = await asyncio.gather(
+                *(self.execute_action(step, action, action_results) for _, step, action in layer)
+            )
             
-            if should_execute:
-                try:
-                    # Enhance parameters with dependency results if needed
-                    enhanced_parameters = self.enhance_parameters_with_dependencies(
-                        action["parameters"], dependency_result, action
-                    )
-                    
-                    result = await self.mcp_client.call_server(
-                        action["server"],
-                        action["action"], 
-                        enhanced_parameters
-                    )
-                    
-                    action_result = {
-                        "step": step,
-                        "action": action,
-                        "success": True,
-                        "result": result,
-                        "timestamp": datetime.now().isoformat(),
-                        "ai_reasoning": action.get("rationale", ""),
-                        "dependency_used": depends_on is not None
-                    }
-                    
-                    results.append(action_result)
+            for (index, step, _), action_result in zip(layer, layer_results):
+                results[index] = action_result
+                # Only executed, successful steps can satisfy later dependencies
+                if action_result["success"] and not action_result.get("skipped"):
                     action_results[step] = action_result
-                    
-                except Exception as e:
-                    error_result = {
-                        "step": step,
-                        "action": action,
-                        "success": False,
-                        "error": str(e),
-                        "timestamp": datetime.now().isoformat(),
-                        "ai_reasoning": action.get("rationale", ""),
-                        "dependency_used": depends_on is not None
-                    }
-                    
-                    results.append(error_result)
-                    # Don't store failed results for dependencies
                 
         return results
     
+    async def execute_action(self, step: int, action: Dict[str, Any], action_results: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """Execute a single action, honouring its dependency and condition"""
+        
+        # Check if this action depends on a previous step
+        depends_on = action.get("depends_on")
+        condition = action.get("condition")
+        
+        dependency_result = None
+        
+        if depends_on is not None:
+            dependency_result = action_results.get(depends_on)
+            if dependency_result is None:
+                return {
+                    "step": step,
+                    "action": action,
+                    "success": False,
+                    "error": f"Dependency step {depends_on} not found or failed",
+                    "timestamp": datetime.now().isoformat(),
+                    "ai_reasoning": action.get("rationale", ""),
+                    "skipped": True
+                }
+            
+            # Evaluate condition if specified
+            if condition and not self.evaluate_condition(condition, dependency_result):
+                return {
+                    "step": step,
+                    "action": action,
+                    "success": True,
+                    "result": {"message": f"Condition '{condition}' not met, step skipped"},
+                    "timestamp": datetime.now().isoformat(),
+                    "ai_reasoning": action.get("rationale", ""),
+                    "skipped": True,
+                    "condition_evaluated": condition
+                }
+        
+        try:
+            # Enhance parameters with dependency results if needed
+            enhanced_parameters = self.enhance_parameters_with_dependencies(
+                action["parameters"], dependency_result, action
+            )
+            
+            result = await self.mcp_client.call_server(
+                action["server"],
+                action["action"], 
+                enhanced_parameters
+            )
+            
+            return {
+                "step": step,
+                "action": action,
+                "success": True,
+                "result": result,
+                "timestamp": datetime.now().isoformat(),
+                "ai_reasoning": action.get("rationale", ""),
+                "dependency_used": depends_on is not None
+            }
+            
+        except Exception as e:
+            # Failed results are not stored for dependencies
+            return {
+                "step": step,
+                "action": action,
+                "success": False,
+                "error": str(e),
+                "timestamp": datetime.now().isoformat(),
+                "ai_reasoning": action.get("rationale", ""),
+                "dependency_used": depends_on is not None
+            }
+    
     def evaluate_condition(self, condition: str, dependency_result: Dict[str, Any]) -> bool:
         """Evaluate a condition based on dependency result"""
         try:
@@ -415,49 +486,7 @@ Focus on:
                 return False
                 
             result_data = dependency_result.get("result", {})
-            
-            # Common condition patterns
-            if "threat_score" in condition:
-                # Extract threat score from various possible locations
-                threat_score = 0
-                if "threat_score" in result_data:
-                    threat_score = result_data["threat_score"]
-                elif "data" in result_data and "threat_score" in result_data["data"]:
-                    threat_score = result_data["data"]["threat_score"]
-                elif "malicious" in result_data and "total" in result_data:
-                    # VirusTotal-style response
-                    malicious = result_data.get("malicious", 0)
-                    total = result_data.get("total", 1)
-                    threat_score = (malicious / total) * 100 if total > 0 else 0
-                
-                # Evaluate numeric conditions
-                if ">" in condition:
-                    threshold = float(condition.split(">")[1].strip())
-                    return threat_score > threshold
-                elif "<" in condition:
-                    threshold = float(condition.split("<")[1].strip())
-                    return threat_score < threshold
-                elif "==" in condition:
-                    threshold = float(condition.split("==")[1].strip())
-                    return threat_score == threshold
-            
-            elif "severity" in condition:
-                severity = result_data.get("severity", "").lower()
-                if "high" in condition.lower():
-                    return severity in ["high", "critical"]
-                elif "critical" in condition.lower():
-                    return severity == "critical"
-                elif "medium" in condition.lower():
-                    return severity in ["medium", "high", "critical"]
-            
-            elif "compromised" in condition.lower():
-                status = result_data.get("status", "").lower()
-                return "compromised" in status or "infected" in status
-            
-            elif "malicious" in condition.lower():
-                return result_data.get("malicious", 0) > 0 or "malicious" in str(result_data).lower()
-            
-            return True  # Default to true if condition can't be evaluated
+            return _compile_condition(condition)(result_data)
             
         except Exception as e:
             print(f"Error evaluating condition '{condition}': {e}")
@@ -7,14 +7,20 @@ import json
 class MCPClient:
     """Client for communicating with MCP servers"""
     
-    def __init__(self, server_configs: Dict[str, Dict[str, Any]]):
+    def __init__(self, server_configs: Dict[str, Dict[str, Any]], session: Optional[aiohttp.ClientSession] = None):
         self.server_configs = server_configs
-        self.session = None
+        self.session = session
+        # A caller-supplied session stays open after close(); only our own is torn down
+        self._owns_session = session is None
         
     async def get_session(self):
         """Get or create aiohttp session"""
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            # Pooled keep-alive connections shared by every server call
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60)
+            )
+            self._owns_session = True
         return self.session
         
     async def call_server(self, server_name: str, action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
@@ -73,23 +79,29 @@ class MCPClient:
         """Test connectivity to all configured servers"""
         results = {}
         
-        for server_name in self.server_configs:
-            try:
-                capabilities = await self.get_server_capabilities(server_name)
+        # Probe every server concurrently; a failure only marks that server offline
+        server_names = list(self.server_configs)
+        responses = await asyncio.gather(
+            *(self.get_server_capabilities(server_name) for server_name in server_names),
+            return_exceptions=True
+        )
+        
+        for server_name, capabilities in zip(server_names, responses):
+            if isinstance(capabilities, BaseException):
                 results[server_name] = {
-                    "status": "online",
-                    "capabilities": capabilities
+                    "status": "offline", 
+                    "error": str(capabilities)
                 }
-            except Exception as e:
+            else:
                 results[server_name] = {
-                    "status": "offline", 
-                    "error": str(e)
+                    "status": "online",
+                    "capabilities": capabilities
                 }
                 
         return results
         
     async def close(self):
-        """Close the aiohttp session"""
-        if self.session:
+        """Close the aiohttp session if this client created it"""
+        if self.session and self._owns_session:
             await self.session.close()
             self.session = None
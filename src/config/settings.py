@@ -47,7 +47,8 @@ class AppConfig:
             "region": "us-east-1",
             "max_tokens": 2000,
             "temperature": 0.1,
-            "fallback_to_rules": True
+            "fallback_to_rules": True,
+            "latency_optimized": False
         }
         
     def to_dict(self) -> Dict[str, Any]:
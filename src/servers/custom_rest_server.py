@@ -1,5 +1,6 @@
 
 from fastapi import FastAPI, HTTPException, Header
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import requests
@@ -8,6 +9,7 @@ import yaml
 import json
 
 app = FastAPI(title="Custom REST Plugin MCP Server", version="1.0.0")
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
 
 class APIConfiguration(BaseModel):
     name: str
@@ -31,38 +33,41 @@ class MCPResponse(BaseModel):
 # Storage for registered APIs
 registered_apis = {}
 
-@app.get("/meta")
-async def get_metadata():
-    """Get server metadata and capabilities"""
-    return {
-        "server_name": "custom_rest",
-        "version": "1.0.0",
-        "capabilities": ["register_api", "call_endpoint", "list_apis"],
-        "description": "Custom REST API wrapper generator from OpenAPI/Swagger specs",
-        "authentication_required": False,
-        "endpoints": {
-            "register_api": {
-                "method": "POST",
-                "parameters": {"config": "APIConfiguration"},
-                "description": "Register a new REST API configuration"
-            },
-            "call_endpoint": {
-                "method": "POST", 
-                "parameters": {
-                    "api_name": "string",
-                    "endpoint_name": "string",
-                    "parameters": "object"
-                },
-                "description": "Call a registered API endpoint"
+# Static server metadata, built once at import and returned as-is by /meta
+SERVER_METADATA = {
+    "server_name": "custom_rest",
+    "version": "1.0.0",
+    "capabilities": ["register_api", "call_endpoint", "list_apis"],
+    "description": "Custom REST API wrapper generator from OpenAPI/Swagger specs",
+    "authentication_required": False,
+    "endpoints": {
+        "register_api": {
+            "method": "POST",
+            "parameters": {"config": "APIConfiguration"},
+            "description": "Register a new REST API configuration"
+        },
+        "call_endpoint": {
+            "method": "POST", 
+            "parameters": {
+                "api_name": "string",
+                "endpoint_name": "string",
+                "parameters": "object"
             },
-            "list_apis": {
-                "method": "GET",
-                "description": "List all registered APIs"
-            }
+            "description": "Call a registered API endpoint"
+        },
+        "list_apis": {
+            "method": "GET",
+            "description": "List all registered APIs"
         }
     }
+}
+
+@app.get("/meta")
+async def get_metadata():
+    """Get server metadata and capabilities"""
+    return SERVER_METADATA
 
-@app.post("/register_api", response_model=MCPResponse)
+@app.post("/register_api", responses={200: {"model": MCPResponse}})
 async def register_api(request: RegisterAPIRequest):
     """Register a new REST API configuration"""
     
@@ -77,16 +82,17 @@ async def register_api(request: RegisterAPIRequest):
             "endpoints": config.endpoints
         }
         
-        return MCPResponse(success=True, data={
+        return {"success": True, "data": {
             "message": f"API '{api_name}' registered successfully",
             "endpoints": list(config.endpoints.keys())
-        })
+        }}
         
     except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+        return {"success": False, "error": str(e)}
 
-@app.post("/call_endpoint", response_model=MCPResponse)
-async def call_endpoint(request: CallEndpointRequest):
+# Plain def: the blocking requests call runs in FastAPI's threadpool, not on the event loop
+@app.post("/call_endpoint", responses={200: {"model": MCPResponse}})
+def call_endpoint(request: CallEndpointRequest):
     """Call a registered API endpoint"""
     
     try:
@@ -95,12 +101,12 @@ async def call_endpoint(request: CallEndpointRequest):
         parameters = request.parameters
         
         if api_name not in registered_apis:
-            return MCPResponse(success=False, error=f"API '{api_name}' not registered")
+            return {"success": False, "error": f"API '{api_name}' not registered"}
             
         api_config = registered_apis[api_name]
         
         if endpoint_name not in api_config["endpoints"]:
-            return MCPResponse(success=False, error=f"Endpoint '{endpoint_name}' not found in API '{api_name}'")
+            return {"success": False, "error": f"Endpoint '{endpoint_name}' not found in API '{api_name}'"}
             
         endpoint_config = api_config["endpoints"][endpoint_name]
         
@@ -110,7 +116,8 @@ async def call_endpoint(request: CallEndpointRequest):
         method = endpoint_config.get("method", "GET").upper()
         
         url = f"{base_url.rstrip('/')}{endpoint_path}"
-        headers = api_config["headers"].copy()
+        # requests merges these into its own header dict, so no defensive copy
+        headers = api_config["headers"]
         
         # Make the API call
         if method == "GET":
@@ -122,7 +129,7 @@ async def call_endpoint(request: CallEndpointRequest):
         elif method == "DELETE":
             response = requests.delete(url, params=parameters, headers=headers)
         else:
-            return MCPResponse(success=False, error=f"Unsupported HTTP method: {method}")
+            return {"success": False, "error": f"Unsupported HTTP method: {method}"}
             
         # Parse response
         if response.status_code == 200:
@@ -131,17 +138,17 @@ async def call_endpoint(request: CallEndpointRequest):
             except:
                 result_data = {"raw_response": response.text}
                 
-            return MCPResponse(success=True, data={
+            return {"success": True, "data": {
                 "api_name": api_name,
                 "endpoint_name": endpoint_name,
                 "status_code": response.status_code,
                 "response": result_data
-            })
+            }}
         else:
-            return MCPResponse(success=False, error=f"API call failed with status {response.status_code}: {response.text}")
+            return {"success": False, "error": f"API call failed with status {response.status_code}: {response.text}"}
             
     except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+        return {"success": False, "error": str(e)}
 
 @app.get("/list_apis")
 async def list_apis():
@@ -191,13 +198,21 @@ async def register_from_openapi(openapi_spec: Dict[str, Any], api_name: str):
             "endpoints": config.endpoints
         }
         
-        return MCPResponse(success=True, data={
+        return {"success": True, "data": {
             "message": f"API '{api_name}' registered from OpenAPI spec",
             "endpoints": list(endpoints.keys())
-        })
+        }}
         
     except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+        return {"success": False, "error": str(e)}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8004)
+    # Registered APIs live in process memory, so this server stays single-worker
+    uvicorn.run(
+        "custom_rest_server:app",
+        host="0.0.0.0",
+        port=8004,
+        workers=1,
+        limit_concurrency=1000,
+        timeout_keep_alive=30
+    )
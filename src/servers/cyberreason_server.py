@@ -1,10 +1,28 @@
 
-from fastapi import FastAPI, HTTPException, Header
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+import os
 import uvicorn
 
-app = FastAPI(title="CyberReason MCP Server", version="1.0.0")
+app = FastAPI(
+    title="CyberReason MCP Server",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+# Endpoints that reject requests without an Authorization header
+AUTH_REQUIRED_PATHS = frozenset({"/get_pylum_id", "/check_terminal_status"})
+
+@app.middleware("http")
+async def require_authorization(request: Request, call_next):
+    """Reject unauthenticated calls before the request body is parsed"""
+    if request.url.path in AUTH_REQUIRED_PATHS and not request.headers.get("authorization"):
+        return ORJSONResponse({"detail": "Authorization token required"}, status_code=401)
+    return await call_next(request)
 
 class GetPylumIdRequest(BaseModel):
     hostname: Optional[str] = None
@@ -52,116 +70,109 @@ MOCK_ENDPOINTS = {
     }
 }
 
-@app.get("/meta")
-async def get_metadata():
-    """Get server metadata and capabilities"""
-    return {
-        "server_name": "cyberreason",
-        "version": "1.0.0",
-        "capabilities": ["get_pylum_id", "check_terminal_status"],
-        "description": "CyberReason endpoint detection and response platform",
-        "authentication_required": True,
-        "endpoints": {
-            "get_pylum_id": {
-                "method": "POST",
-                "parameters": {
-                    "hostname": "string (optional)",
-                    "sensor_id": "string (optional)"
-                },
-                "description": "Get Pylum ID for a hostname or sensor"
+# Lookup tables and responses derived once from the static mock data
+PYLUM_ID_BY_HOSTNAME = {
+    endpoint["hostname"]: {
+        "hostname": endpoint["hostname"],
+        "pylum_id": endpoint["pylum_id"],
+        "sensor_id": endpoint["sensor_id"]
+    }
+    for endpoint in MOCK_ENDPOINTS.values()
+}
+PYLUM_ID_BY_SENSOR_ID = {
+    endpoint["sensor_id"]: PYLUM_ID_BY_HOSTNAME[endpoint["hostname"]]
+    for endpoint in MOCK_ENDPOINTS.values()
+}
+
+STATUS_REPORTS = {
+    hostname: {
+        "hostname": endpoint["hostname"],
+        "pylum_id": endpoint["pylum_id"],
+        "status": endpoint["status"],
+        "threat_level": endpoint["threat_level"],
+        "last_seen": endpoint["last_seen"],
+        "os": endpoint["os"],
+        "ip_address": endpoint["ip_address"],
+        "malops_count": len(endpoint["malops"]),
+        "malops": endpoint["malops"],
+        "is_compromised": endpoint["status"] == "compromised"
+    }
+    for hostname, endpoint in MOCK_ENDPOINTS.items()
+}
+STATUS_REPORTS_BY_PYLUM_ID = {
+    report["pylum_id"]: report for report in STATUS_REPORTS.values()
+}
+
+# Static server metadata, built once at import and returned as-is by /meta
+SERVER_METADATA = {
+    "server_name": "cyberreason",
+    "version": "1.0.0",
+    "capabilities": ["get_pylum_id", "check_terminal_status"],
+    "description": "CyberReason endpoint detection and response platform",
+    "authentication_required": True,
+    "endpoints": {
+        "get_pylum_id": {
+            "method": "POST",
+            "parameters": {
+                "hostname": "string (optional)",
+                "sensor_id": "string (optional)"
             },
-            "check_terminal_status": {
-                "method": "POST",
-                "parameters": {
-                    "hostname": "string (optional)",
-                    "pylum_id": "string (optional)"
-                },
-                "description": "Check if terminal/endpoint is compromised"
-            }
+            "description": "Get Pylum ID for a hostname or sensor"
+        },
+        "check_terminal_status": {
+            "method": "POST",
+            "parameters": {
+                "hostname": "string (optional)",
+                "pylum_id": "string (optional)"
+            },
+            "description": "Check if terminal/endpoint is compromised"
         }
     }
+}
 
-@app.post("/get_pylum_id", response_model=MCPResponse)
-async def get_pylum_id(request: GetPylumIdRequest, authorization: Optional[str] = Header(None)):
+@app.get("/meta")
+async def get_metadata():
+    """Get server metadata and capabilities"""
+    return SERVER_METADATA
+
+@app.post("/get_pylum_id", responses={200: {"model": MCPResponse}})
+async def get_pylum_id(request: GetPylumIdRequest):
     """Get Pylum ID based on hostname or sensor ID"""
     
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization token required")
-    
     try:
-        hostname = request.hostname
-        sensor_id = request.sensor_id
-        
-        # Search by hostname first
-        if hostname:
-            for endpoint_data in MOCK_ENDPOINTS.values():
-                if endpoint_data["hostname"] == hostname:
-                    return MCPResponse(success=True, data={
-                        "hostname": hostname,
-                        "pylum_id": endpoint_data["pylum_id"],
-                        "sensor_id": endpoint_data["sensor_id"]
-                    })
-                    
-        # Search by sensor_id
-        if sensor_id:
-            for endpoint_data in MOCK_ENDPOINTS.values():
-                if endpoint_data["sensor_id"] == sensor_id:
-                    return MCPResponse(success=True, data={
-                        "hostname": endpoint_data["hostname"],
-                        "pylum_id": endpoint_data["pylum_id"], 
-                        "sensor_id": sensor_id
-                    })
+        # Search by hostname first, then by sensor_id
+        data = PYLUM_ID_BY_HOSTNAME.get(request.hostname) or PYLUM_ID_BY_SENSOR_ID.get(request.sensor_id)
+        if data:
+            return {"success": True, "data": data}
                     
-        return MCPResponse(success=False, error="Endpoint not found")
+        return {"success": False, "error": "Endpoint not found"}
         
     except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+        return {"success": False, "error": str(e)}
 
-@app.post("/check_terminal_status", response_model=MCPResponse)
-async def check_terminal_status(request: CheckTerminalStatusRequest, authorization: Optional[str] = Header(None)):
+@app.post("/check_terminal_status", responses={200: {"model": MCPResponse}})
+async def check_terminal_status(request: CheckTerminalStatusRequest):
     """Check terminal/endpoint status for compromise indicators"""
     
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization token required")
-    
     try:
-        hostname = request.hostname
-        pylum_id = request.pylum_id
-        
-        endpoint_data = None
+        # Search by hostname first, then by pylum_id
+        status_report = STATUS_REPORTS.get(request.hostname) or STATUS_REPORTS_BY_PYLUM_ID.get(request.pylum_id)
+        if not status_report:
+            return {"success": False, "error": "Endpoint not found"}
         
-        # Search by hostname
-        if hostname and hostname in MOCK_ENDPOINTS:
-            endpoint_data = MOCK_ENDPOINTS[hostname]
-            
-        # Search by pylum_id
-        elif pylum_id:
-            for data in MOCK_ENDPOINTS.values():
-                if data["pylum_id"] == pylum_id:
-                    endpoint_data = data
-                    break
-                    
-        if not endpoint_data:
-            return MCPResponse(success=False, error="Endpoint not found")
-            
         # Return comprehensive status
-        status_report = {
-            "hostname": endpoint_data["hostname"],
-            "pylum_id": endpoint_data["pylum_id"],
-            "status": endpoint_data["status"],
-            "threat_level": endpoint_data["threat_level"],
-            "last_seen": endpoint_data["last_seen"],
-            "os": endpoint_data["os"],
-            "ip_address": endpoint_data["ip_address"],
-            "malops_count": len(endpoint_data["malops"]),
-            "malops": endpoint_data["malops"],
-            "is_compromised": endpoint_data["status"] == "compromised"
-        }
-        
-        return MCPResponse(success=True, data=status_report)
+        return {"success": True, "data": status_report}
         
     except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+        return {"success": False, "error": str(e)}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8003)
+    # Lookups only read static data, so every core can serve requests
+    uvicorn.run(
+        "cyberreason_server:app",
+        host="0.0.0.0",
+        port=8003,
+        workers=os.cpu_count(),
+        limit_concurrency=1000,
+        timeout_keep_alive=30
+    )
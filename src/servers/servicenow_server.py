@@ -1,14 +1,20 @@
 
-from fastapi import FastAPI, HTTPException, Header
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
-import uuid
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, Dict, Any, List, AsyncIterator
+from contextlib import asynccontextmanager
+import os
+import secrets
+import time
 import datetime
+import orjson
 import uvicorn
 
-app = FastAPI(title="ServiceNow MCP Server", version="1.0.0")
-
 class CreateRecordRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     type: str  # incident, task, etc.
     summary: str
     description: str
@@ -16,101 +22,286 @@ class CreateRecordRequest(BaseModel):
     assigned_to: Optional[str] = None
 
 class GetRecordRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     record_id: str
 
+class CreateRecordsRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
+    items: List[CreateRecordRequest]
+
+class GetRecordsRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
+    record_ids: List[str]
+
 class MCPResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+class MCPBatchResponse(BaseModel):
+    success: bool
+    data: Optional[List[Optional[Dict[str, Any]]]] = None  # null entries mark missing record IDs
+    error: Optional[str] = None
+
+# Record timestamps have one-second resolution, so the ISO string is
+# formatted at most once per second and reused in between
+_last_ts_sec = 0
+_last_ts_str = ""
+
+def _now_iso() -> str:
+    """Current local time as an ISO-8601 string, cached per second"""
+    global _last_ts_sec, _last_ts_str
+    now = int(time.time())
+    if now != _last_ts_sec:
+        _last_ts_str = datetime.datetime.fromtimestamp(now).isoformat()
+        _last_ts_sec = now
+    return _last_ts_str
+
 # In-memory storage for demo (in production, this would be ServiceNow API)
 records_storage = {}
 
+class InMemoryRecordStore:
+    """Process-local record store (only consistent with a single worker)"""
+
+    def __init__(self, records: Dict[str, Dict[str, Any]]):
+        self.records = records
+
+    async def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        return self.records.get(record_id)
+
+    async def put(self, record: Dict[str, Any]):
+        self.records[record["record_id"]] = record
+
+    async def get_many(self, record_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        return [self.records.get(record_id) for record_id in record_ids]
+
+    async def put_many(self, records: List[Dict[str, Any]]):
+        self.records.update((record["record_id"], record) for record in records)
+
+    async def iter_records(self) -> AsyncIterator[Dict[str, Any]]:
+        # Snapshot the values so concurrent inserts don't break iteration
+        for record in list(self.records.values()):
+            yield record
+
+    async def close(self):
+        pass
+
+class RedisRecordStore:
+    """Redis-backed record store shared by all uvicorn workers"""
+
+    KEY_PREFIX = "rec:"
+    SCAN_BATCH = 500
+
+    def __init__(self, url: str):
+        # Imported lazily so the default in-memory setup doesn't need redis
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+
+    async def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(f"{self.KEY_PREFIX}{record_id}")
+        return orjson.loads(raw) if raw is not None else None
+
+    async def put(self, record: Dict[str, Any]):
+        await self.redis.set(f"{self.KEY_PREFIX}{record['record_id']}", orjson.dumps(record))
+
+    async def get_many(self, record_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        if not record_ids:
+            return []
+        raws = await self.redis.mget([f"{self.KEY_PREFIX}{record_id}" for record_id in record_ids])
+        return [orjson.loads(raw) if raw is not None else None for raw in raws]
+
+    async def put_many(self, records: List[Dict[str, Any]]):
+        # One round-trip for the whole batch
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for record in records:
+                pipe.set(f"{self.KEY_PREFIX}{record['record_id']}", orjson.dumps(record))
+            await pipe.execute()
+
+    async def iter_records(self) -> AsyncIterator[Dict[str, Any]]:
+        # Fetch in MGET batches so memory stays flat without a GET per key
+        batch = []
+        async for key in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*", count=self.SCAN_BATCH):
+            batch.append(key)
+            if len(batch) == self.SCAN_BATCH:
+                for raw in await self.redis.mget(batch):
+                    if raw is not None:
+                        yield orjson.loads(raw)
+                batch = []
+        if batch:
+            for raw in await self.redis.mget(batch):
+                if raw is not None:
+                    yield orjson.loads(raw)
+
+    async def close(self):
+        await self.redis.aclose()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Switch to the shared Redis store when SERVICENOW_REDIS_URL is set"""
+    redis_url = os.environ.get("SERVICENOW_REDIS_URL")
+    if redis_url:
+        app.state.record_store = RedisRecordStore(redis_url)
+    yield
+    await app.state.record_store.close()
+
+app = FastAPI(
+    title="ServiceNow MCP Server",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+app.state.record_store = InMemoryRecordStore(records_storage)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+# Endpoints that reject requests without an Authorization header
+AUTH_REQUIRED_PATHS = frozenset({"/create_record", "/get_record", "/create_records", "/get_records"})
+
+@app.middleware("http")
+async def require_authorization(request: Request, call_next):
+    """Reject unauthenticated calls before the request body is parsed"""
+    if request.url.path in AUTH_REQUIRED_PATHS and not request.headers.get("authorization"):
+        return ORJSONResponse({"detail": "Authorization required"}, status_code=401)
+    return await call_next(request)
+
+# Static server metadata, built once at import and returned as-is by /meta
+SERVER_METADATA = {
+    "server_name": "servicenow",
+    "version": "1.0.0", 
+    "capabilities": ["create_record", "get_record", "create_records", "get_records"],
+    "description": "ServiceNow ITSM integration for incident and task management",
+    "authentication_required": True,
+    "endpoints": {
+        "create_record": {
+            "method": "POST",
+            "parameters": {
+                "type": "string",
+                "summary": "string", 
+                "description": "string",
+                "severity": "string (optional)",
+                "assigned_to": "string (optional)"
+            },
+            "description": "Create a new record (incident/task)"
+        },
+        "get_record": {
+            "method": "POST",
+            "parameters": {"record_id": "string"},
+            "description": "Retrieve a record by ID"
+        },
+        "create_records": {
+            "method": "POST",
+            "parameters": {"items": "array of create_record parameters"},
+            "description": "Create several records in one call"
+        },
+        "get_records": {
+            "method": "POST",
+            "parameters": {"record_ids": "array of strings"},
+            "description": "Retrieve several records by ID (null for missing IDs)"
+        }
+    }
+}
+
 @app.get("/meta")
 async def get_metadata():
     """Get server metadata and capabilities"""
+    return SERVER_METADATA
+
+def _build_record(request: CreateRecordRequest, timestamp: str) -> Dict[str, Any]:
+    """Build a new record with a fresh ID from a create request"""
     return {
-        "server_name": "servicenow",
-        "version": "1.0.0", 
-        "capabilities": ["create_record", "get_record"],
-        "description": "ServiceNow ITSM integration for incident and task management",
-        "authentication_required": True,
-        "endpoints": {
-            "create_record": {
-                "method": "POST",
-                "parameters": {
-                    "type": "string",
-                    "summary": "string", 
-                    "description": "string",
-                    "severity": "string (optional)",
-                    "assigned_to": "string (optional)"
-                },
-                "description": "Create a new record (incident/task)"
-            },
-            "get_record": {
-                "method": "POST",
-                "parameters": {"record_id": "string"},
-                "description": "Retrieve a record by ID"
-            }
-        }
+        "record_id": f"INC{secrets.token_hex(4).upper()}",
+        "type": request.type,
+        "summary": request.summary,
+        "description": request.description,
+        "severity": request.severity,
+        "assigned_to": request.assigned_to or "Unassigned",
+        "status": "New",
+        "created_at": timestamp,
+        "updated_at": timestamp,
+        "created_by": "MCP Agent"
     }
 
-@app.post("/create_record", response_model=MCPResponse)
-async def create_record(request: CreateRecordRequest, authorization: Optional[str] = Header(None)):
+@app.post("/create_record", responses={200: {"model": MCPResponse}})
+async def create_record(request: CreateRecordRequest):
     """Create a new ServiceNow record"""
     
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization required")
-    
     try:
-        # Generate unique record ID
-        record_id = f"INC{str(uuid.uuid4())[:8].upper()}"
-        
-        # Create record
-        record = {
-            "record_id": record_id,
-            "type": request.type,
-            "summary": request.summary,
-            "description": request.description,
-            "severity": request.severity,
-            "assigned_to": request.assigned_to or "Unassigned",
-            "status": "New",
-            "created_at": datetime.datetime.now().isoformat(),
-            "updated_at": datetime.datetime.now().isoformat(),
-            "created_by": "MCP Agent"
-        }
+        record = _build_record(request, _now_iso())
         
         # Store record
-        records_storage[record_id] = record
+        await app.state.record_store.put(record)
         
-        return MCPResponse(success=True, data=record)
+        return {"success": True, "data": record}
         
     except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+        return {"success": False, "error": str(e)}
 
-@app.post("/get_record", response_model=MCPResponse)
-async def get_record(request: GetRecordRequest, authorization: Optional[str] = Header(None)):
+@app.post("/get_record", responses={200: {"model": MCPResponse}})
+async def get_record(request: GetRecordRequest):
     """Get a ServiceNow record by ID"""
     
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization required")
-    
     try:
         record_id = request.record_id
+        record = await app.state.record_store.get(record_id)
+        
+        if record is None:
+            return {"success": False, "error": f"Record {record_id} not found"}
+        
+        # The stored record is never mutated, so it is returned without a copy
+        return {"success": True, "data": record}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.post("/create_records", responses={200: {"model": MCPBatchResponse}})
+async def create_records(request: CreateRecordsRequest):
+    """Create several ServiceNow records in one request"""
+    
+    try:
+        timestamp = _now_iso()
+        records = [_build_record(item, timestamp) for item in request.items]
+        await app.state.record_store.put_many(records)
         
-        if record_id not in records_storage:
-            return MCPResponse(success=False, error=f"Record {record_id} not found")
-            
-        record = records_storage[record_id]
-        return MCPResponse(success=True, data=record)
+        return {"success": True, "data": records}
         
     except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+        return {"success": False, "error": str(e)}
+
+@app.post("/get_records", responses={200: {"model": MCPBatchResponse}})
+async def get_records(request: GetRecordsRequest):
+    """Get several ServiceNow records by ID"""
+    
+    try:
+        records = await app.state.record_store.get_many(request.record_ids)
+        return {"success": True, "data": records}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+async def _stream_records() -> AsyncIterator[bytes]:
+    """Encode the record listing one record at a time"""
+    yield b'{"records":['
+    separator = b""
+    async for record in app.state.record_store.iter_records():
+        yield separator + orjson.dumps(record)
+        separator = b","
+    yield b"]}"
 
 @app.get("/records")
 async def list_all_records():
     """List all records (for debugging)"""
-    return {"records": list(records_storage.values())}
+    return StreamingResponse(_stream_records(), media_type="application/json")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    # Workers only see each other's records through the Redis store
+    workers = os.cpu_count() if os.environ.get("SERVICENOW_REDIS_URL") else 1
+    uvicorn.run(
+        "servicenow_server:app",
+        host="0.0.0.0",
+        port=8002,
+        workers=workers,
+        limit_concurrency=1000,
+        timeout_keep_alive=30
+    )
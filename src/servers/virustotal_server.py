@@ -1,17 +1,67 @@
 
-from fastapi import FastAPI, HTTPException, Header
-from pydantic import BaseModel
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any
-import asyncio
-import aiohttp
+from types import MappingProxyType
+from urllib.parse import urlparse
+from aiocache import cached, Cache
+from aiocache.serializers import PickleSerializer
+import os
+import hashlib
 import uvicorn
 
-app = FastAPI(title="VirusTotal MCP Server", version="1.0.0")
+# Seconds a looked-up report is served from cache before hitting VirusTotal again
+REPORT_CACHE_TTL = 300
+
+def _report_cache_config() -> Dict[str, Any]:
+    """Report cache backend: Redis when VT_REDIS_URL is set, else per-process memory"""
+    redis_url = os.environ.get("VT_REDIS_URL")
+    if not redis_url:
+        return {"cache": Cache.MEMORY}
+    url = urlparse(redis_url)
+    return {
+        "cache": Cache.REDIS,
+        "endpoint": url.hostname or "localhost",
+        "port": url.port or 6379,
+        "db": int(url.path.lstrip("/") or 0),
+        "password": url.password,
+        "namespace": "vt"
+    }
+
+def _report_cache_key(func, kind: str, indicator: str) -> str:
+    """Fixed-length cache key, so long indicators (URLs, hashes) stay compact in Redis"""
+    return f"{kind}:{hashlib.blake2b(indicator.encode(), digest_size=16).hexdigest()}"
+
+# Shared by all workers when backed by Redis, so repeat indicators hit across processes
+REPORT_CACHE_CONFIG = _report_cache_config()
+
+app = FastAPI(
+    title="VirusTotal MCP Server",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+# Endpoints that reject requests without an API key header
+AUTH_REQUIRED_PATHS = frozenset({"/ip_report", "/domain_report"})
+
+@app.middleware("http")
+async def require_authorization(request: Request, call_next):
+    """Reject unauthenticated calls before the request body is parsed"""
+    if request.url.path in AUTH_REQUIRED_PATHS and not request.headers.get("x-api-key"):
+        return ORJSONResponse({"detail": "API key required"}, status_code=401)
+    return await call_next(request)
 
 class IPReportRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     ip: str
 
 class DomainReportRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     domain: str
 
 class MCPResponse(BaseModel):
@@ -19,8 +69,8 @@ class MCPResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
-# Mock VirusTotal responses for demo
-MOCK_RESPONSES = {
+# Mock VirusTotal responses for demo (read-only)
+MOCK_RESPONSES = MappingProxyType({
     "192.168.1.100": {
         "ip": "192.168.1.100",
         "reputation": "malicious",
@@ -38,89 +88,90 @@ MOCK_RESPONSES = {
         "first_seen": "2024-01-10",
         "last_analysis": "2024-01-20"
     }
-}
+})
 
-@app.get("/meta")
-async def get_metadata():
-    """Get server metadata and capabilities"""
-    return {
-        "server_name": "virustotal",
-        "version": "1.0.0",
-        "capabilities": ["ip_report", "domain_report"],
-        "description": "VirusTotal reputation and threat intelligence",
-        "authentication_required": True,
-        "endpoints": {
-            "ip_report": {
-                "method": "POST",
-                "parameters": {"ip": "string"},
-                "description": "Get IP reputation report"
-            },
-            "domain_report": {
-                "method": "POST", 
-                "parameters": {"domain": "string"},
-                "description": "Get domain reputation report"
-            }
+# Clean report templates for unknown indicators, keyed by indicator type
+# (which is also the report field the indicator itself is filled into)
+DEFAULT_REPORTS = MappingProxyType({
+    "ip": MappingProxyType({
+        "reputation": "clean",
+        "threat_score": 10,
+        "detections": 0,
+        "total_engines": 20,
+        "first_seen": "unknown",
+        "last_seen": "unknown"
+    }),
+    "domain": MappingProxyType({
+        "reputation": "clean",
+        "threat_score": 5,
+        "categories": ("uncategorized",),
+        "first_seen": "unknown",
+        "last_analysis": "unknown"
+    })
+})
+
+# Static server metadata, built once at import and returned as-is by /meta
+SERVER_METADATA = {
+    "server_name": "virustotal",
+    "version": "1.0.0",
+    "capabilities": ["ip_report", "domain_report"],
+    "description": "VirusTotal reputation and threat intelligence",
+    "authentication_required": True,
+    "endpoints": {
+        "ip_report": {
+            "method": "POST",
+            "parameters": {"ip": "string"},
+            "description": "Get IP reputation report"
+        },
+        "domain_report": {
+            "method": "POST", 
+            "parameters": {"domain": "string"},
+            "description": "Get domain reputation report"
         }
     }
+}
 
-@app.post("/ip_report", response_model=MCPResponse)
-async def get_ip_report(request: IPReportRequest, x_api_key: Optional[str] = Header(None)):
-    """Get IP reputation report from VirusTotal"""
-    
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="API key required")
-    
+@cached(
+    ttl=REPORT_CACHE_TTL,
+    key_builder=_report_cache_key,
+    serializer=PickleSerializer(),
+    **REPORT_CACHE_CONFIG
+)
+async def lookup_report(kind: str, indicator: str) -> Dict[str, Any]:
+    """Look up a reputation report for an indicator of the given kind"""
+    return MOCK_RESPONSES.get(indicator) or {kind: indicator, **DEFAULT_REPORTS[kind]}
+
+async def report_response(kind: str, indicator: str) -> Dict[str, Any]:
+    """Wrap a report lookup in the MCP response envelope"""
     try:
         # In production, this would call the actual VirusTotal API
         # For demo, we use mock data
-        ip = request.ip
-        
-        if ip in MOCK_RESPONSES:
-            report = MOCK_RESPONSES[ip]
-        else:
-            # Default response for unknown IPs
-            report = {
-                "ip": ip,
-                "reputation": "clean",
-                "threat_score": 10,
-                "detections": 0,
-                "total_engines": 20,
-                "first_seen": "unknown",
-                "last_seen": "unknown"
-            }
-            
-        return MCPResponse(success=True, data=report)
+        return {"success": True, "data": await lookup_report(kind, indicator)}
         
     except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+        return {"success": False, "error": str(e)}
 
-@app.post("/domain_report", response_model=MCPResponse)
-async def get_domain_report(request: DomainReportRequest, x_api_key: Optional[str] = Header(None)):
+@app.get("/meta")
+async def get_metadata():
+    """Get server metadata and capabilities"""
+    return SERVER_METADATA
+
+@app.post("/ip_report", responses={200: {"model": MCPResponse}})
+async def get_ip_report(request: IPReportRequest):
+    """Get IP reputation report from VirusTotal"""
+    return await report_response("ip", request.ip)
+
+@app.post("/domain_report", responses={200: {"model": MCPResponse}})
+async def get_domain_report(request: DomainReportRequest):
     """Get domain reputation report from VirusTotal"""
-    
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="API key required")
-    
-    try:
-        domain = request.domain
-        
-        if domain in MOCK_RESPONSES:
-            report = MOCK_RESPONSES[domain]
-        else:
-            # Default response for unknown domains
-            report = {
-                "domain": domain,
-                "reputation": "clean", 
-                "threat_score": 5,
-                "categories": ["uncategorized"],
-                "first_seen": "unknown",
-                "last_analysis": "unknown"
-            }
-            
-        return MCPResponse(success=True, data=report)
-        
-    except Exception as e:
-        return MCPResponse(success=False, error=str(e))
+    return await report_response("domain", request.domain)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    uvicorn.run(
+        "virustotal_server:app",
+        host="0.0.0.0",
+        port=8001,
+        workers=os.cpu_count(),
+        limit_concurrency=1000,
+        timeout_keep_alive=30
+    )
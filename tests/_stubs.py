@@ -0,0 +1,46 @@
+
+"""Lightweight hand-written stand-ins for the hottest mocks in the test suite"""
+
+from types import SimpleNamespace
+
+class StubBody:
+    """Bedrock response body whose read() returns a fixed payload"""
+
+    __slots__ = ("_payload",)
+
+    def __init__(self, payload: bytes):
+        self._payload = payload
+
+    def read(self) -> bytes:
+        return self._payload
+
+def make_bedrock_stub(payload: bytes) -> SimpleNamespace:
+    """Bedrock runtime client stub; invoke_model kwargs are recorded in .calls"""
+    body = StubBody(payload)
+    calls = []
+
+    def invoke_model(**kwargs):
+        calls.append(kwargs)
+        return {"body": body}
+
+    return SimpleNamespace(invoke_model=invoke_model, calls=calls)
+
+class AsyncSequence:
+    """Async callable returning (or raising) canned responses in order; calls are recorded in .calls"""
+
+    __slots__ = ("_responses", "calls")
+
+    def __init__(self, responses):
+        self._responses = iter(responses)
+        self.calls = []
+
+    @property
+    def call_count(self) -> int:
+        return len(self.calls)
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append(args)
+        response = next(self._responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
@@ -2,12 +2,37 @@
 import pytest
 import asyncio
 import aiohttp
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
 import json
 from typing import Dict, Any
+from tests._stubs import make_bedrock_stub
 
-# Test data fixtures
-@pytest.fixture
+# Bedrock invoke_model body for the mocked Claude analysis, encoded once at import
+BEDROCK_ANALYSIS_BODY = json.dumps({
+    'content': [{
+        'text': json.dumps({
+            "reasoning": "Test analysis",
+            "severity_assessment": "high", 
+            "flow_strategy": "Sequential analysis",
+            "determined_actions": [
+                {
+                    "step": 1,
+                    "server": "virustotal",
+                    "action": "ip_report",
+                    "parameters": {"ip": "192.168.1.100"},
+                    "priority": "high",
+                    "rationale": "Check IP reputation"
+                }
+            ],
+            "risk_indicators": ["suspicious_ip"],
+            "expected_flow_outcomes": ["IP reputation analysis"],
+            "recommended_follow_up": "Monitor endpoint"
+        })
+    }]
+}).encode()
+
+# Test data fixtures (read-only ones are session-scoped and built once; copy before mutating)
+@pytest.fixture(scope="session")
 def sample_event_data():
     """Sample security event data for testing"""
     return {
@@ -22,7 +47,7 @@ def sample_event_data():
         "description": "Suspicious file detected on endpoint"
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_event_attributes():
     """Sample extracted event attributes"""
     return {
@@ -37,7 +62,7 @@ def sample_event_attributes():
         "network_info": {"src_ip": "192.168.1.100", "dst_ip": "malicious-domain.com"}
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_server_configs():
     """Mock MCP server configurations"""
     return {
@@ -58,7 +83,7 @@ def mock_server_configs():
         }
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_virustotal_response():
     """Mock VirusTotal API response"""
     return {
@@ -72,7 +97,7 @@ def mock_virustotal_response():
         }
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_servicenow_response():
     """Mock ServiceNow API response"""
     return {
@@ -86,7 +111,7 @@ def mock_servicenow_response():
         }
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_cyberreason_response():
     """Mock CyberReason API response"""
     return {
@@ -102,38 +127,10 @@ def mock_cyberreason_response():
 
 @pytest.fixture
 def mock_bedrock_client():
-    """Mock AWS Bedrock client"""
-    mock_client = MagicMock()
-    mock_response = {
-        'body': MagicMock()
-    }
-    mock_response['body'].read.return_value = json.dumps({
-        'content': [{
-            'text': json.dumps({
-                "reasoning": "Test analysis",
-                "severity_assessment": "high", 
-                "flow_strategy": "Sequential analysis",
-                "determined_actions": [
-                    {
-                        "step": 1,
-                        "server": "virustotal",
-                        "action": "ip_report",
-                        "parameters": {"ip": "192.168.1.100"},
-                        "priority": "high",
-                        "rationale": "Check IP reputation"
-                    }
-                ],
-                "risk_indicators": ["suspicious_ip"],
-                "expected_flow_outcomes": ["IP reputation analysis"],
-                "recommended_follow_up": "Monitor endpoint"
-            })
-        }]
-    }).encode()
-    
-    mock_client.invoke_model.return_value = mock_response
-    return mock_client
+    """Stub AWS Bedrock client returning the mocked Claude analysis"""
+    return make_bedrock_stub(BEDROCK_ANALYSIS_BODY)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
     loop = asyncio.new_event_loop()
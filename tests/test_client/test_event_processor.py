@@ -1,95 +1,142 @@
 
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-import json
-import boto3
+from src.client import event_processor
 from src.client.event_processor import EventProcessor
 from src.client.mcp_client import MCPClient
+from tests._stubs import AsyncSequence
+
+pytestmark = pytest.mark.unit
+
+# Event carrying an MD5 and a SHA-256 digest (read-only, shared across tests)
+HASH_EVENT_DATA = {
+    "md5_hash": "d41d8cd98f00b204e9800998ecf8427e",
+    "sha256_hash": "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+}
+
+@pytest.fixture(scope="class")
+def boto3_client():
+    """Patch boto3.client once for the whole test class"""
+    with patch('boto3.client') as mock_boto:
+        yield mock_boto
+
+@pytest.fixture
+def processor_factory(boto3_client):
+    """Build EventProcessors under the shared boto3 patch, resetting it after each test"""
+    def factory(mcp_client=None, bedrock_client=None, **options):
+        boto3_client.return_value = bedrock_client or MagicMock(spec=["invoke_model"])
+        return EventProcessor(mcp_client or MagicMock(), **options)
+    
+    yield factory
+    boto3_client.reset_mock(return_value=True)
 
 class TestEventProcessor:
     """Test cases for EventProcessor"""
     
-    def test_init(self, mock_server_configs):
+    def test_init(self, boto3_client, processor_factory, mock_server_configs):
         """Test EventProcessor initialization"""
         mock_mcp_client = MagicMock()
         
-        with patch('boto3.client') as mock_boto:
-            processor = EventProcessor(mock_mcp_client)
-            assert processor.mcp_client == mock_mcp_client
-            assert processor.claude_model_id == "anthropic.claude-3-5-sonnet-20241022-v2:0"
-            mock_boto.assert_called_once_with('bedrock-runtime', region_name='us-east-1')
+        processor = processor_factory(mock_mcp_client)
+        assert processor.mcp_client == mock_mcp_client
+        assert processor.claude_model_id == "anthropic.claude-3-5-sonnet-20241022-v2:0"
+        boto3_client.assert_called_once_with('bedrock-runtime', region_name='us-east-1')
     
-    def test_extract_event_attributes(self, mock_server_configs, sample_event_data):
+    def test_extract_event_attributes(self, processor_factory, mock_server_configs, sample_event_data):
         """Test event attribute extraction"""
         mock_mcp_client = MagicMock()
         
-        with patch('boto3.client'):
-            processor = EventProcessor(mock_mcp_client)
-            attributes = processor.extract_event_attributes(sample_event_data)
-            
-            assert attributes["event_type"] == "malware_detection"
-            assert attributes["severity"] == "high"
-            assert "192.168.1.100" in attributes["indicators"]["ips"]
-            assert "malicious-domain.com" in attributes["indicators"]["domains"]
-            assert attributes["host_info"]["hostname"] == "workstation-01"
+        processor = processor_factory(mock_mcp_client)
+        attributes = processor.extract_event_attributes(sample_event_data)
+        
+        assert attributes["event_type"] == "malware_detection"
+        assert attributes["severity"] == "high"
+        assert "192.168.1.100" in attributes["indicators"]["ips"]
+        assert "malicious-domain.com" in attributes["indicators"]["domains"]
+        assert attributes["host_info"]["hostname"] == "workstation-01"
     
-    def test_extract_event_attributes_with_hashes(self, mock_server_configs):
+    def test_extract_event_attributes_with_hashes(self, processor_factory, mock_server_configs):
         """Test hash extraction from event data"""
         mock_mcp_client = MagicMock()
         
-        event_data = {
-            "md5_hash": "d41d8cd98f00b204e9800998ecf8427e",
-            "sha256_hash": "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
-        }
+        processor = processor_factory(mock_mcp_client)
+        attributes = processor.extract_event_attributes(HASH_EVENT_DATA)
         
-        with patch('boto3.client'):
-            processor = EventProcessor(mock_mcp_client)
-            attributes = processor.extract_event_attributes(event_data)
-            
-            assert "md5" in attributes["indicators"]
-            assert "sha256" in attributes["indicators"]
-            assert "d41d8cd98f00b204e9800998ecf8427e" in attributes["indicators"]["md5"]
+        assert "md5" in attributes["indicators"]
+        assert "sha256" in attributes["indicators"]
+        assert "d41d8cd98f00b204e9800998ecf8427e" in attributes["indicators"]["md5"]
+    
+    @pytest.mark.parametrize("hash_type,file_hash", [
+        ("md5", "d41d8cd98f00b204e9800998ecf8427e"),
+        ("sha1", "da39a3ee5e6b4b0d3255bfef95601890afd80709"),
+        ("sha256", "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855")
+    ])
+    def test_extract_event_attributes_hash_types(self, processor_factory, hash_type, file_hash):
+        """Test each supported hash length is bucketed under its hash type"""
+        mock_mcp_client = MagicMock()
+        
+        processor = processor_factory(mock_mcp_client)
+        attributes = processor.extract_event_attributes({"file_hash": file_hash})
+        
+        assert attributes["indicators"][hash_type] == [file_hash]
     
     @pytest.mark.asyncio
-    async def test_process_event(self, mock_server_configs, sample_event_data, mock_bedrock_client):
+    async def test_process_event(self, processor_factory, mock_server_configs, sample_event_data, mock_bedrock_client):
         """Test complete event processing"""
         mock_mcp_client = AsyncMock()
         mock_mcp_client.call_server.return_value = {"success": True, "data": {"threat_score": 85}}
         
-        with patch('boto3.client', return_value=mock_bedrock_client):
-            processor = EventProcessor(mock_mcp_client)
-            
-            result = await processor.process_event(sample_event_data, "Check if this IP is malicious")
-            
-            assert "event_id" in result
-            assert "analysis" in result
-            assert "results" in result
-            assert result["user_prompt"] == "Check if this IP is malicious"
+        processor = processor_factory(mock_mcp_client, mock_bedrock_client)
+        
+        result = await processor.process_event(sample_event_data, "Check if this IP is malicious")
+        
+        assert "event_id" in result
+        assert "analysis" in result
+        assert "results" in result
+        assert result["user_prompt"] == "Check if this IP is malicious"
     
     @pytest.mark.asyncio
-    async def test_analyze_with_claude(self, mock_server_configs, sample_event_data, sample_event_attributes, mock_bedrock_client):
+    async def test_analyze_with_claude(self, processor_factory, mock_server_configs, sample_event_data, sample_event_attributes, mock_bedrock_client):
         """Test Claude analysis"""
         mock_mcp_client = MagicMock()
         
-        with patch('boto3.client', return_value=mock_bedrock_client):
-            processor = EventProcessor(mock_mcp_client)
-            
-            analysis = await processor.analyze_with_claude(
-                sample_event_data, 
-                sample_event_attributes, 
-                "Check if this IP is malicious"
-            )
-            
-            assert "determined_actions" in analysis
-            assert "reasoning" in analysis
-            assert "severity_assessment" in analysis
-            assert analysis["ai_model"] == "claude-3.5-sonnet"
+        processor = processor_factory(mock_mcp_client, mock_bedrock_client)
+        
+        analysis = await processor.analyze_with_claude(
+            sample_event_data, 
+            sample_event_attributes, 
+            "Check if this IP is malicious"
+        )
+        
+        assert "determined_actions" in analysis
+        assert "reasoning" in analysis
+        assert "severity_assessment" in analysis
+        assert analysis["ai_model"] == "claude-3.5-sonnet"
+        assert "performanceConfigLatency" not in mock_bedrock_client.calls[0]
+    
+    @pytest.mark.asyncio
+    async def test_analyze_with_claude_latency_optimized(self, processor_factory, sample_event_data, sample_event_attributes, mock_bedrock_client):
+        """Test latency-optimized inference is requested when enabled"""
+        processor = processor_factory(bedrock_client=mock_bedrock_client, latency_optimized=True)
+        
+        await processor.analyze_with_claude(
+            sample_event_data,
+            sample_event_attributes,
+            "Check if this IP is malicious"
+        )
+        
+        assert mock_bedrock_client.calls[0]["performanceConfigLatency"] == "optimized"
+        
+        # The stub takes any kwargs; the installed botocore must accept them too
+        import botocore.session
+        service = botocore.session.get_session().get_service_model("bedrock-runtime")
+        assert set(processor.invoke_options) <= set(service.operation_model("InvokeModel").input_shape.members)
     
     @pytest.mark.asyncio
     async def test_analyze_with_claude_fallback(self, mock_server_configs, sample_event_data, sample_event_attributes):
         """Test Claude analysis fallback"""
         mock_mcp_client = MagicMock()
-        mock_bedrock_client = MagicMock()
+        mock_bedrock_client = MagicMock(spec=["invoke_model"])
         mock_bedrock_client.invoke_model.side_effect = Exception("AWS Error")
         
         with patch('boto3.client', return_value=mock_bedrock_client):
@@ -104,116 +151,127 @@ class TestEventProcessor:
             assert analysis["ai_model"] == "rule-based-fallback"
             assert "fallback" in analysis["reasoning"].lower()
     
-    def test_fallback_analysis(self, mock_server_configs, sample_event_attributes):
+    @pytest.mark.parametrize("prompt,expected_server,expected_action", [
+        ("check if this IP is malicious", "virustotal", "ip_report"),
+        ("create a ServiceNow ticket", "servicenow", "create_record")
+    ])
+    def test_fallback_analysis(self, processor_factory, sample_event_attributes, prompt, expected_server, expected_action):
         """Test fallback rule-based analysis"""
         mock_mcp_client = MagicMock()
         
-        with patch('boto3.client'):
-            processor = EventProcessor(mock_mcp_client)
-            
-            # Test malicious IP prompt
-            analysis = processor.fallback_analysis(sample_event_attributes, "check if this IP is malicious")
-            
-            assert len(analysis["determined_actions"]) > 0
-            assert any(action["server"] == "virustotal" for action in analysis["determined_actions"])
-            
-            # Test incident creation prompt
-            analysis = processor.fallback_analysis(sample_event_attributes, "create a ServiceNow ticket")
-            
-            assert any(action["server"] == "servicenow" for action in analysis["determined_actions"])
+        processor = processor_factory(mock_mcp_client)
+        analysis = processor.fallback_analysis(sample_event_attributes, prompt)
+        
+        planned = {(action["server"], action["action"]) for action in analysis["determined_actions"]}
+        assert (expected_server, expected_action) in planned
+    
+    def test_matchers_are_precompiled(self, processor_factory, sample_event_data, sample_event_attributes):
+        """Test extraction and fallback use the module's compiled patterns, not the re cache"""
+        processor = processor_factory()
+        
+        with patch.object(event_processor, "re") as mock_re:
+            processor.extract_event_attributes(sample_event_data)
+            processor.fallback_analysis(sample_event_attributes, "check if this IP is malicious")
+        
+        assert mock_re.mock_calls == []
     
-    def test_evaluate_condition(self, mock_server_configs):
+    @pytest.mark.parametrize("condition,result,expected", [
+        # Threat score condition
+        ("threat_score > 70", {"threat_score": 85}, True),
+        ("threat_score > 90", {"threat_score": 85}, False),
+        # Severity condition
+        ("severity high", {"severity": "high"}, True),
+        # Compromised condition
+        ("compromised", {"status": "compromised"}, True)
+    ])
+    def test_evaluate_condition(self, processor_factory, condition, result, expected):
         """Test condition evaluation"""
         mock_mcp_client = MagicMock()
         
-        with patch('boto3.client'):
-            processor = EventProcessor(mock_mcp_client)
-            
-            # Test threat score condition
-            dependency_result = {
-                "success": True,
-                "result": {"threat_score": 85}
-            }
-            
-            assert processor.evaluate_condition("threat_score > 70", dependency_result)
-            assert not processor.evaluate_condition("threat_score > 90", dependency_result)
-            
-            # Test severity condition
-            dependency_result["result"] = {"severity": "high"}
-            assert processor.evaluate_condition("severity high", dependency_result)
-            
-            # Test compromised condition
-            dependency_result["result"] = {"status": "compromised"}
-            assert processor.evaluate_condition("compromised", dependency_result)
+        processor = processor_factory(mock_mcp_client)
+        dependency_result = {"success": True, "result": result}
+        
+        assert processor.evaluate_condition(condition, dependency_result) == expected
+    
+    def test_evaluate_condition_parses_once(self, processor_factory):
+        """Test a repeated condition is parsed once and served from the cache"""
+        processor = processor_factory()
+        dependency_result = {"success": True, "result": {"threat_score": 85}}
+        event_processor._compile_condition.cache_clear()
+        
+        assert processor.evaluate_condition("threat_score > 70", dependency_result)
+        assert processor.evaluate_condition("threat_score > 70", dependency_result)
+        
+        cache_info = event_processor._compile_condition.cache_info()
+        assert cache_info.misses == 1
+        assert cache_info.hits == 1
     
     @pytest.mark.asyncio
-    async def test_execute_actions(self, mock_server_configs, sample_event_data):
+    async def test_execute_actions(self, processor_factory, mock_server_configs, sample_event_data):
         """Test action execution"""
         mock_mcp_client = AsyncMock()
         mock_mcp_client.call_server.return_value = {"success": True, "data": {"threat_score": 85}}
         
-        with patch('boto3.client'):
-            processor = EventProcessor(mock_mcp_client)
-            
-            analysis = {
-                "determined_actions": [
-                    {
-                        "step": 1,
-                        "server": "virustotal",
-                        "action": "ip_report",
-                        "parameters": {"ip": "192.168.1.100"},
-                        "priority": "high",
-                        "rationale": "Check IP reputation"
-                    }
-                ]
-            }
-            
-            results = await processor.execute_actions(sample_event_data, analysis)
-            
-            assert len(results) == 1
-            assert results[0]["success"]
-            assert results[0]["step"] == 1
-            mock_mcp_client.call_server.assert_called_once()
+        processor = processor_factory(mock_mcp_client)
+        
+        analysis = {
+            "determined_actions": [
+                {
+                    "step": 1,
+                    "server": "virustotal",
+                    "action": "ip_report",
+                    "parameters": {"ip": "192.168.1.100"},
+                    "priority": "high",
+                    "rationale": "Check IP reputation"
+                }
+            ]
+        }
+        
+        results = await processor.execute_actions(sample_event_data, analysis)
+        
+        assert len(results) == 1
+        assert results[0]["success"]
+        assert results[0]["step"] == 1
+        mock_mcp_client.call_server.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_execute_actions_with_dependencies(self, mock_server_configs, sample_event_data):
+    async def test_execute_actions_with_dependencies(self, processor_factory, mock_server_configs, sample_event_data):
         """Test action execution with dependencies"""
         mock_mcp_client = AsyncMock()
         
         # First call returns threat score, second call creates incident
-        mock_mcp_client.call_server.side_effect = [
+        mock_mcp_client.call_server = AsyncSequence([
             {"success": True, "data": {"threat_score": 85}},
             {"success": True, "data": {"record_id": "INC123"}}
-        ]
+        ])
         
-        with patch('boto3.client'):
-            processor = EventProcessor(mock_mcp_client)
-            
-            analysis = {
-                "determined_actions": [
-                    {
-                        "step": 1,
-                        "server": "virustotal", 
-                        "action": "ip_report",
-                        "parameters": {"ip": "192.168.1.100"},
-                        "priority": "high",
-                        "rationale": "Check IP reputation"
-                    },
-                    {
-                        "step": 2,
-                        "server": "servicenow",
-                        "action": "create_record", 
-                        "parameters": {"type": "incident", "summary": "Test"},
-                        "depends_on": 1,
-                        "condition": "threat_score > 70",
-                        "priority": "high",
-                        "rationale": "Create incident if threat detected"
-                    }
-                ]
-            }
-            
-            results = await processor.execute_actions(sample_event_data, analysis)
-            
-            assert len(results) == 2
-            assert all(result["success"] for result in results)
-            assert mock_mcp_client.call_server.call_count == 2
+        processor = processor_factory(mock_mcp_client)
+        
+        analysis = {
+            "determined_actions": [
+                {
+                    "step": 1,
+                    "server": "virustotal", 
+                    "action": "ip_report",
+                    "parameters": {"ip": "192.168.1.100"},
+                    "priority": "high",
+                    "rationale": "Check IP reputation"
+                },
+                {
+                    "step": 2,
+                    "server": "servicenow",
+                    "action": "create_record", 
+                    "parameters": {"type": "incident", "summary": "Test"},
+                    "depends_on": 1,
+                    "condition": "threat_score > 70",
+                    "priority": "high",
+                    "rationale": "Create incident if threat detected"
+                }
+            ]
+        }
+        
+        results = await processor.execute_actions(sample_event_data, analysis)
+        
+        assert len(results) == 2
+        assert all(result["success"] for result in results)
+        assert mock_mcp_client.call_server.call_count == 2
@@ -1,10 +1,39 @@
 
 import pytest
+import pytest_asyncio
+import asyncio
 import aiohttp
 from unittest.mock import AsyncMock, patch, MagicMock
 import json
+from contextlib import asynccontextmanager
 from src.client.mcp_client import MCPClient
 
+pytestmark = pytest.mark.unit
+
+class ConcurrencyTrackingSession:
+    """Fake aiohttp session recording how many GETs are in flight at once"""
+    
+    def __init__(self, response):
+        self.response = response
+        self.active = 0
+        self.max_active = 0
+    
+    @asynccontextmanager
+    async def get(self, url):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0)
+            yield self.response
+        finally:
+            self.active -= 1
+
+@pytest_asyncio.fixture(scope="module")
+async def shared_session():
+    """One real aiohttp session borrowed by every client in this module"""
+    async with aiohttp.ClientSession() as session:
+        yield session
+
 class TestMCPClient:
     """Test cases for MCPClient"""
     
@@ -25,59 +54,55 @@ class TestMCPClient:
         await client.close()
     
     @pytest.mark.asyncio
-    async def test_call_server_success(self, mock_server_configs, mock_virustotal_response):
+    async def test_call_server_success(self, mock_server_configs, mock_virustotal_response, shared_session):
         """Test successful server call"""
-        client = MCPClient(mock_server_configs)
+        client = MCPClient(mock_server_configs, session=shared_session)
         
         # Mock aiohttp response
-        mock_response = AsyncMock()
+        mock_response = MagicMock()
         mock_response.status = 200
         mock_response.json = AsyncMock(return_value=mock_virustotal_response)
         
-        # Mock session
-        mock_session = AsyncMock()
-        mock_session.post.return_value.__aenter__.return_value = mock_response
-        client.session = mock_session
-        
-        result = await client.call_server("virustotal", "ip_report", {"ip": "192.168.1.100"})
+        # Mock the shared session's POST
+        with patch.object(shared_session, "post") as mock_post:
+            mock_post.return_value.__aenter__.return_value = mock_response
+            result = await client.call_server("virustotal", "ip_report", {"ip": "192.168.1.100"})
         
         assert result == mock_virustotal_response
-        mock_session.post.assert_called_once()
+        mock_post.assert_called_once()
+        
+        # Closing the client leaves a borrowed session open
         await client.close()
+        assert client.session is shared_session
+        assert not shared_session.closed
     
     @pytest.mark.asyncio
-    async def test_call_server_unknown_server(self, mock_server_configs):
+    async def test_call_server_unknown_server(self, mock_server_configs, shared_session):
         """Test calling unknown server"""
-        client = MCPClient(mock_server_configs)
+        client = MCPClient(mock_server_configs, session=shared_session)
         
         with pytest.raises(ValueError, match="Unknown server: unknown"):
             await client.call_server("unknown", "test_action", {})
-        
-        await client.close()
     
     @pytest.mark.asyncio
-    async def test_call_server_error_response(self, mock_server_configs):
+    async def test_call_server_error_response(self, mock_server_configs, shared_session):
         """Test server error response"""
-        client = MCPClient(mock_server_configs)
+        client = MCPClient(mock_server_configs, session=shared_session)
         
         # Mock error response
-        mock_response = AsyncMock()
+        mock_response = MagicMock()
         mock_response.status = 500
         mock_response.text = AsyncMock(return_value="Internal Server Error")
         
-        mock_session = AsyncMock()
-        mock_session.post.return_value.__aenter__.return_value = mock_response
-        client.session = mock_session
-        
-        with pytest.raises(Exception, match="Server virustotal returned 500"):
-            await client.call_server("virustotal", "ip_report", {"ip": "192.168.1.100"})
-        
-        await client.close()
+        with patch.object(shared_session, "post") as mock_post:
+            mock_post.return_value.__aenter__.return_value = mock_response
+            with pytest.raises(Exception, match="Server virustotal returned 500"):
+                await client.call_server("virustotal", "ip_report", {"ip": "192.168.1.100"})
     
     @pytest.mark.asyncio
-    async def test_get_server_capabilities(self, mock_server_configs):
+    async def test_get_server_capabilities(self, mock_server_configs, shared_session):
         """Test getting server capabilities"""
-        client = MCPClient(mock_server_configs)
+        client = MCPClient(mock_server_configs, session=shared_session)
         
         capabilities = {
             "server_name": "virustotal",
@@ -86,33 +111,29 @@ class TestMCPClient:
         }
         
         # Mock response
-        mock_response = AsyncMock()
+        mock_response = MagicMock()
         mock_response.status = 200
         mock_response.json = AsyncMock(return_value=capabilities)
         
-        mock_session = AsyncMock()
-        mock_session.get.return_value.__aenter__.return_value = mock_response
-        client.session = mock_session
+        with patch.object(shared_session, "get") as mock_get:
+            mock_get.return_value.__aenter__.return_value = mock_response
+            result = await client.get_server_capabilities("virustotal")
         
-        result = await client.get_server_capabilities("virustotal")
         assert result == capabilities
-        await client.close()
     
     @pytest.mark.asyncio
     async def test_test_all_servers(self, mock_server_configs):
         """Test testing all servers"""
-        client = MCPClient(mock_server_configs)
+        # Session that yields to the loop inside each request and tracks overlap
+        mock_response = MagicMock()
+        mock_session = ConcurrencyTrackingSession(mock_response)
+        client = MCPClient(mock_server_configs, session=mock_session)
         
         # Mock successful response for all servers
         capabilities = {"server_name": "test", "status": "online"}
-        mock_response = AsyncMock()
         mock_response.status = 200
         mock_response.json = AsyncMock(return_value=capabilities)
         
-        mock_session = AsyncMock()
-        mock_session.get.return_value.__aenter__.return_value = mock_response
-        client.session = mock_session
-        
         results = await client.test_all_servers()
         
         assert len(results) == len(mock_server_configs)
@@ -120,4 +141,5 @@ class TestMCPClient:
             assert server_name in results
             assert results[server_name]["status"] == "online"
         
-        await client.close()
+        # All servers were probed concurrently rather than one after another
+        assert mock_session.max_active == len(mock_server_configs)
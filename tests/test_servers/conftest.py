@@ -0,0 +1,43 @@
+
+import httpx
+import pytest
+import pytest_asyncio
+from src.servers.servicenow_server import records_storage
+from src.servers.virustotal_server import app as vt_app
+
+# Field values for seeded ServiceNow records; per-test overrides are layered on top
+SEED_RECORD = {
+    "type": "incident",
+    "severity": "low",
+    "assigned_to": "Unassigned",
+    "status": "New",
+    "created_at": "2024-01-20T10:30:00Z",
+    "updated_at": "2024-01-20T10:30:00Z",
+    "created_by": "MCP Agent"
+}
+
+@pytest.fixture
+def seed_records():
+    """Insert ServiceNow records straight into storage, bypassing the HTTP layer"""
+    def seed(n, **overrides):
+        records = {
+            f"REC{i}": {
+                **SEED_RECORD,
+                "record_id": f"REC{i}",
+                "summary": f"Test incident {i}",
+                "description": f"Test description {i}",
+                **overrides
+            }
+            for i in range(n)
+        }
+        records_storage.update(records)
+        return list(records)
+    return seed
+
+@pytest_asyncio.fixture(scope="session")
+async def vt_client():
+    """One async VirusTotal client over the ASGI app, inside one app lifespan, per test session"""
+    async with vt_app.router.lifespan_context(vt_app):
+        transport = httpx.ASGITransport(app=vt_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
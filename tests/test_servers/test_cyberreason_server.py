@@ -3,16 +3,26 @@ import pytest
 from fastapi.testclient import TestClient
 from src.servers.cyberreason_server import app
 
+pytestmark = pytest.mark.unit
+
+# Authorization header sent by every authenticated request
+HEADERS = {"Authorization": "Bearer test-token"}
+
+# Lookup payload for the known, compromised workstation shared by several tests
+WORKSTATION_PAYLOAD = {"hostname": "workstation-01"}
+
+@pytest.fixture(scope="module")
+def client():
+    """One TestClient, and one app lifespan, shared by every test in this module"""
+    with TestClient(app) as test_client:
+        yield test_client
+
 class TestCyberReasonServer:
     """Test cases for CyberReason MCP Server"""
     
-    def setup_method(self):
-        """Setup test client"""
-        self.client = TestClient(app)
-    
-    def test_get_metadata(self):
+    def test_get_metadata(self, client):
         """Test metadata endpoint"""
-        response = self.client.get("/meta")
+        response = client.get("/meta")
         assert response.status_code == 200
         
         data = response.json()
@@ -22,12 +32,10 @@ class TestCyberReasonServer:
         assert "check_terminal_status" in data["capabilities"]
         assert data["authentication_required"] is True
     
-    def test_get_pylum_id_by_hostname(self):
-        """Test getting Pylum ID by hostname"""
-        headers = {"Authorization": "Bearer test-token"}
-        payload = {"hostname": "workstation-01"}
-        
-        response = self.client.post("/get_pylum_id", json=payload, headers=headers)
+    @pytest.mark.parametrize("payload", [WORKSTATION_PAYLOAD, {"sensor_id": "SEN_87654321"}], ids=["hostname", "sensor_id"])
+    def test_get_pylum_id(self, client, payload):
+        """Test getting Pylum ID by hostname or sensor ID"""
+        response = client.post("/get_pylum_id", json=payload, headers=HEADERS)
         assert response.status_code == 200
         
         data = response.json()
@@ -36,45 +44,29 @@ class TestCyberReasonServer:
         assert data["data"]["pylum_id"] == "PYL_12345678"
         assert data["data"]["sensor_id"] == "SEN_87654321"
     
-    def test_get_pylum_id_by_sensor_id(self):
-        """Test getting Pylum ID by sensor ID"""
-        headers = {"Authorization": "Bearer test-token"}
-        payload = {"sensor_id": "SEN_87654321"}
-        
-        response = self.client.post("/get_pylum_id", json=payload, headers=headers)
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert data["success"] is True
-        assert data["data"]["hostname"] == "workstation-01"
-        assert data["data"]["pylum_id"] == "PYL_12345678"
-        assert data["data"]["sensor_id"] == "SEN_87654321"
-    
-    def test_get_pylum_id_not_found(self):
+    def test_get_pylum_id_not_found(self, client):
         """Test getting Pylum ID for unknown endpoint"""
-        headers = {"Authorization": "Bearer test-token"}
         payload = {"hostname": "unknown-host"}
         
-        response = self.client.post("/get_pylum_id", json=payload, headers=headers)
+        response = client.post("/get_pylum_id", json=payload, headers=HEADERS)
         assert response.status_code == 200
         
         data = response.json()
         assert data["success"] is False
         assert "not found" in data["error"]
     
-    def test_get_pylum_id_no_auth(self):
-        """Test getting Pylum ID without authentication"""
-        payload = {"hostname": "workstation-01"}
-        
-        response = self.client.post("/get_pylum_id", json=payload)
+    @pytest.mark.parametrize("endpoint,payload", [
+        ("/get_pylum_id", WORKSTATION_PAYLOAD),
+        ("/check_terminal_status", WORKSTATION_PAYLOAD)
+    ])
+    def test_endpoint_no_auth(self, client, endpoint, payload):
+        """Test protected endpoints without authentication"""
+        response = client.post(endpoint, json=payload)
         assert response.status_code == 401
     
-    def test_check_terminal_status_by_hostname(self):
+    def test_check_terminal_status_by_hostname(self, client):
         """Test checking terminal status by hostname"""
-        headers = {"Authorization": "Bearer test-token"}
-        payload = {"hostname": "workstation-01"}
-        
-        response = self.client.post("/check_terminal_status", json=payload, headers=headers)
+        response = client.post("/check_terminal_status", json=WORKSTATION_PAYLOAD, headers=HEADERS)
         assert response.status_code == 200
         
         data = response.json()
@@ -85,12 +77,11 @@ class TestCyberReasonServer:
         assert data["data"]["is_compromised"] is True
         assert data["data"]["malops_count"] == 1
     
-    def test_check_terminal_status_by_pylum_id(self):
+    def test_check_terminal_status_by_pylum_id(self, client):
         """Test checking terminal status by Pylum ID"""
-        headers = {"Authorization": "Bearer test-token"}
         payload = {"pylum_id": "PYL_12345678"}
         
-        response = self.client.post("/check_terminal_status", json=payload, headers=headers)
+        response = client.post("/check_terminal_status", json=payload, headers=HEADERS)
         assert response.status_code == 200
         
         data = response.json()
@@ -99,12 +90,11 @@ class TestCyberReasonServer:
         assert data["data"]["pylum_id"] == "PYL_12345678"
         assert data["data"]["status"] == "compromised"
     
-    def test_check_terminal_status_clean_endpoint(self):
+    def test_check_terminal_status_clean_endpoint(self, client):
         """Test checking status of clean endpoint"""
-        headers = {"Authorization": "Bearer test-token"}
         payload = {"hostname": "server-02"}
         
-        response = self.client.post("/check_terminal_status", json=payload, headers=headers)
+        response = client.post("/check_terminal_status", json=payload, headers=HEADERS)
         assert response.status_code == 200
         
         data = response.json()
@@ -115,21 +105,13 @@ class TestCyberReasonServer:
         assert data["data"]["is_compromised"] is False
         assert data["data"]["malops_count"] == 0
     
-    def test_check_terminal_status_not_found(self):
+    def test_check_terminal_status_not_found(self, client):
         """Test checking status of unknown endpoint"""
-        headers = {"Authorization": "Bearer test-token"}
         payload = {"hostname": "unknown-endpoint"}
         
-        response = self.client.post("/check_terminal_status", json=payload, headers=headers)
+        response = client.post("/check_terminal_status", json=payload, headers=HEADERS)
         assert response.status_code == 200
         
         data = response.json()
         assert data["success"] is False
-        assert "not found" in data["error"]
-    
-    def test_check_terminal_status_no_auth(self):
-        """Test checking terminal status without authentication"""
-        payload = {"hostname": "workstation-01"}
-        
-        response = self.client.post("/check_terminal_status", json=payload)
-        assert response.status_code == 401
+        assert "not found" in data["error"]
\ No newline at end of file
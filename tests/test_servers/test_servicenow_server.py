@@ -3,17 +3,27 @@ import pytest
 from fastapi.testclient import TestClient
 from src.servers.servicenow_server import app, records_storage
 
+pytestmark = pytest.mark.unit
+
+# Authorization header sent by every authenticated request
+HEADERS = {"Authorization": "Bearer test-token"}
+
+@pytest.fixture(scope="module")
+def client():
+    """One TestClient, and one app lifespan, shared by every test in this module"""
+    with TestClient(app) as test_client:
+        yield test_client
+
 class TestServiceNowServer:
     """Test cases for ServiceNow MCP Server"""
     
     def setup_method(self):
-        """Setup test client and clear storage"""
-        self.client = TestClient(app)
+        """Clear storage"""
         records_storage.clear()
     
-    def test_get_metadata(self):
+    def test_get_metadata(self, client):
         """Test metadata endpoint"""
-        response = self.client.get("/meta")
+        response = client.get("/meta")
         assert response.status_code == 200
         
         data = response.json()
@@ -23,9 +33,8 @@ class TestServiceNowServer:
         assert "get_record" in data["capabilities"]
         assert data["authentication_required"] is True
     
-    def test_create_record_success(self):
+    def test_create_record_success(self, client):
         """Test successful record creation"""
-        headers = {"Authorization": "Bearer test-token"}
         payload = {
             "type": "incident",
             "summary": "Test incident",
@@ -33,7 +42,7 @@ class TestServiceNowServer:
             "severity": "high"
         }
         
-        response = self.client.post("/create_record", json=payload, headers=headers)
+        response = client.post("/create_record", json=payload, headers=HEADERS)
         assert response.status_code == 200
         
         data = response.json()
@@ -45,36 +54,23 @@ class TestServiceNowServer:
         assert data["data"]["status"] == "New"
         assert "record_id" in data["data"]
     
-    def test_create_record_no_auth(self):
-        """Test record creation without authentication"""
-        payload = {
-            "type": "incident",
-            "summary": "Test incident",
-            "description": "Test description"
-        }
-        
-        response = self.client.post("/create_record", json=payload)
+    @pytest.mark.parametrize("endpoint,payload", [
+        ("/create_record", {"type": "incident", "summary": "Test incident", "description": "Test description"}),
+        ("/get_record", {"record_id": "TEST123"}),
+        ("/create_records", {"items": []}),
+        ("/get_records", {"record_ids": ["TEST123"]})
+    ])
+    def test_endpoint_no_auth(self, client, endpoint, payload):
+        """Test protected endpoints without authentication"""
+        response = client.post(endpoint, json=payload)
         assert response.status_code == 401
     
-    def test_get_record_success(self):
+    def test_get_record_success(self, client, seed_records):
         """Test successful record retrieval"""
-        headers = {"Authorization": "Bearer test-token"}
+        [record_id] = seed_records(1, summary="Test incident")
         
-        # First create a record
-        create_payload = {
-            "type": "incident",
-            "summary": "Test incident",
-            "description": "Test description",
-            "severity": "medium"
-        }
-        
-        create_response = self.client.post("/create_record", json=create_payload, headers=headers)
-        create_data = create_response.json()
-        record_id = create_data["data"]["record_id"]
-        
-        # Now retrieve it
         get_payload = {"record_id": record_id}
-        get_response = self.client.post("/get_record", json=get_payload, headers=headers)
+        get_response = client.post("/get_record", json=get_payload, headers=HEADERS)
         
         assert get_response.status_code == 200
         get_data = get_response.json()
@@ -82,43 +78,78 @@ class TestServiceNowServer:
         assert get_data["data"]["record_id"] == record_id
         assert get_data["data"]["summary"] == "Test incident"
     
-    def test_get_record_not_found(self):
+    def test_get_record_not_found(self, client):
         """Test getting non-existent record"""
-        headers = {"Authorization": "Bearer test-token"}
         payload = {"record_id": "NONEXISTENT"}
         
-        response = self.client.post("/get_record", json=payload, headers=headers)
+        response = client.post("/get_record", json=payload, headers=HEADERS)
         assert response.status_code == 200
         
         data = response.json()
         assert data["success"] is False
         assert "not found" in data["error"]
     
-    def test_get_record_no_auth(self):
-        """Test record retrieval without authentication"""
-        payload = {"record_id": "TEST123"}
+    def test_create_and_get_records_batch(self, client):
+        """Test bulk record creation and retrieval"""
+        items = [
+            {"type": "incident", "summary": f"Bulk incident {i}", "description": "Bulk"}
+            for i in range(3)
+        ]
         
-        response = self.client.post("/get_record", json=payload)
-        assert response.status_code == 401
+        create_response = client.post("/create_records", json={"items": items}, headers=HEADERS)
+        assert create_response.status_code == 200
+        
+        create_data = create_response.json()
+        assert create_data["success"] is True
+        assert [r["summary"] for r in create_data["data"]] == [i["summary"] for i in items]
+        record_ids = [r["record_id"] for r in create_data["data"]]
+        
+        get_payload = {"record_ids": record_ids + ["NONEXISTENT"]}
+        get_response = client.post("/get_records", json=get_payload, headers=HEADERS)
+        
+        get_data = get_response.json()
+        assert get_data["success"] is True
+        assert [r["record_id"] for r in get_data["data"][:3]] == record_ids
+        assert get_data["data"][3] is None
+    
+    def test_get_records_mixed_ids(self, client, seed_records):
+        """Test bulk retrieval returns null in place of missing records"""
+        record_ids = seed_records(2)
+        
+        get_payload = {"record_ids": [record_ids[0], "NONEXISTENT", record_ids[1]]}
+        get_response = client.post("/get_records", json=get_payload, headers=HEADERS)
+        assert get_response.status_code == 200
+        
+        get_data = get_response.json()
+        assert get_data["success"] is True
+        assert get_data["data"][0]["record_id"] == record_ids[0]
+        assert get_data["data"][1] is None
+        assert get_data["data"][2]["record_id"] == record_ids[1]
     
-    def test_list_all_records(self):
+    def test_get_records_schema_allows_missing(self, client):
+        """Test the documented batch response allows null entries for missing records"""
+        schema = client.get("/openapi.json").json()["components"]["schemas"]["MCPBatchResponse"]
+        items = schema["properties"]["data"]["anyOf"][0]["items"]
+        assert {"type": "null"} in items["anyOf"]
+    
+    def test_list_all_records(self, client, seed_records):
         """Test listing all records"""
-        headers = {"Authorization": "Bearer test-token"}
-        
-        # Create a few records
-        for i in range(3):
-            payload = {
-                "type": "incident",
-                "summary": f"Test incident {i}",
-                "description": f"Test description {i}",
-                "severity": "low"
-            }
-            self.client.post("/create_record", json=payload, headers=headers)
+        # Seed a few records directly; only the listing goes over HTTP
+        seed_records(3)
         
         # List all records
-        response = self.client.get("/records")
+        response = client.get("/records")
         assert response.status_code == 200
         
         data = response.json()
         assert "records" in data
         assert len(data["records"]) == 3
+    
+    def test_list_all_records_gzip(self, client, seed_records):
+        """Test large record listings are gzip-compressed"""
+        seed_records(20)
+        
+        response = client.get("/records", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["records"]) == 20